@@ -1,45 +1,278 @@
 import pandas as pd
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs_version
 import numpy as np
 import argparse
+import csv
 import os
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # pyarrow is optional; fall back to the pandas C parser
+    pa = pa_csv = None
 
-# Load data from CSV file
-def load_data(filepath, step=1):
+try:
+    from numba import njit
+except ImportError:  # numba is optional; decimate_m4 falls back to vectorized NumPy
+    njit = None
 
-    print(f"Loading data from: {filepath}")
-    
-    # Ignores comments
-    df = pd.read_csv(filepath, comment='#')
+try:
+    import orjson
+except ImportError:  # orjson is optional; figures are serialized with the stdlib json module
+    orjson = None
+
+# Plotly's orjson engine serializes numeric payloads several times faster than stdlib json
+JSON_ENGINE = 'orjson' if orjson is not None else 'json'
+
+
+# Metadata columns that are never plotted
+IGNORE_COLS = {'X3:', 'Trigger', 'Time_Offset', 'ADC_Status', 'ADC_Sequence', 'Event', 'Comments'}
+
+# Chunk sizes for streaming decimated reads (rows for pandas, bytes for pyarrow)
+CHUNK_ROWS = 500_000
+CHUNK_BYTES = 32 << 20
+
+# Bumped whenever the cached columns change meaning, so older Parquet sidecars are ignored
+CACHE_VERSION = 2
+
+# Smallest bucket (in samples) worth decimating; below this the data is plotted as-is
+M4_MIN_BUCKET = 32
+
+# Hover text for every trace; filled in with .format(channel=..., unit=...)
+HOVER_TEMPLATE = '<b>{channel}</b><br>Time: %{{x:.3f}}s<br>Value: %{{y:.1f}}{unit}<br><extra></extra>'
+
+
+# Count the leading '#' comment and blank lines and return the column names that follow them
+def _read_header(filepath):
+    n_skipped = 0
+    with open(filepath, newline='', encoding='utf-8-sig') as f:
+        for line in f:
+            if line.strip() and not line.startswith('#'):
+                return n_skipped, next(csv.reader([line]))
+            n_skipped += 1
+    return n_skipped, []
+
+
+# Read with the pandas C parser, keeping only every `step`-th data row. Decimated reads
+# stream the file in chunks, so peak memory is bounded by the chunk size rather than the file size.
+def _read_csv_pandas(filepath, step=1):
+    reader = pd.read_csv(filepath, comment='#', usecols=lambda name: name not in IGNORE_COLS,
+                         chunksize=CHUNK_ROWS if step > 1 else None, low_memory=False, cache_dates=True)
+    if step == 1:
+        return reader
+    with reader:
+        parts = []
+        offset = 0  # position of the next kept row within the upcoming chunk
+        for chunk in reader:
+            parts.append(chunk.iloc[offset::step])
+            offset = (offset - len(chunk)) % step
+    return pd.concat(parts, ignore_index=True)
+
+
+# Parse the CSV without the ignored columns, keeping only every `step`-th data row.
+# Uses pyarrow's multithreaded reader when available, streaming decimated reads like the pandas path.
+def _read_csv(filepath, step=1):
+    if pa_csv is None:
+        return _read_csv_pandas(filepath, step)
+
+    # pyarrow has no comment= option, so skip the leading comment block by line count instead
+    n_skipped, names = _read_header(filepath)
+    if not names:
+        return _read_csv_pandas(filepath, step)
+    read_options = pa_csv.ReadOptions(skip_rows=n_skipped, block_size=CHUNK_BYTES)
+    convert_options = pa_csv.ConvertOptions(include_columns=[c for c in names if c not in IGNORE_COLS])
+
+    # Anything pyarrow can't read the way comment='#' would (a '#' line past the header, or,
+    # when streaming, a non-numeric cell or a column that is empty until after the first block,
+    # since types are fixed from that block) is left to the pandas reader, which handles it.
+    try:
+        if step == 1:
+            return pa_csv.read_csv(filepath, read_options=read_options, convert_options=convert_options).to_pandas()
+        with pa_csv.open_csv(filepath, read_options=read_options, convert_options=convert_options) as reader:
+            batches = []
+            offset = 0
+            for batch in reader:
+                batches.append(batch.take(np.arange(offset, batch.num_rows, step)))
+                offset = (offset - batch.num_rows) % step
+            schema = reader.schema
+    except (pa.ArrowInvalid, pa.ArrowKeyError):
+        return _read_csv_pandas(filepath, step)
+    return pa.Table.from_batches(batches, schema=schema).to_pandas()
+
+
+# Parse the CSV into numeric columns, keeping every `step`-th data row
+def _parse_csv(filepath, step=1):
+    # Ignores comments and metadata columns, downsampling while reading
+    df = _read_csv(filepath, step=step)
     
     if 'Time' not in df.columns:
         raise ValueError("Expected a 'Time' column (seconds).")
     
-    # Clean up data
-    df['Time'] = pd.to_numeric(df['Time'], errors='coerce')
-    df = df.dropna(subset=['Time']).sort_values('Time')
+    # Numeric columns come back typed already; coerce the ones that didn't parse cleanly in one pass
+    bad_cols = df.select_dtypes(exclude='number').columns
+    if len(bad_cols):
+        df[bad_cols] = df[bad_cols].apply(pd.to_numeric, errors='coerce')
     
-    ignore_cols = {'X3:', 'Trigger', 'Time_Offset', 'ADC_Status', 'ADC_Sequence', 'Event', 'Comments'}
-    df = df[[c for c in df.columns if c not in ignore_cols]]
+    return df
+
+
+# Load data from CSV file
+def load_data(filepath, step=1, cache=True):
+
+    print(f"Loading data from: {filepath}")
     
-    for c in df.columns:
-        if c != 'Time':
-            df[c] = pd.to_numeric(df[c], errors='coerce')
+    # Parsed full-resolution rows are kept in a Parquet sidecar, reused while it is newer than the CSV.
+    # Every path decimates file rows before cleaning, so --step picks the same samples either way.
+    cache_path = f"{filepath}.v{CACHE_VERSION}.parquet"
+    use_cache = cache and pa_csv is not None
+    df = None
+    if use_cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(filepath):
+        try:
+            df = pd.read_parquet(cache_path, engine='pyarrow')
+        except (OSError, pa.ArrowException) as e:
+            print("Note: Ignoring unreadable data cache. Error:", e)
+        else:
+            print(f"Using cached data: {cache_path}")
+            if step > 1:
+                df = df.iloc[::step]
+    if df is None and use_cache and step == 1:
+        # A missing, stale or unreadable cache is rebuilt from the CSV
+        df = _parse_csv(filepath)
+        # Written beside the cache and renamed into place, so an interrupted run never leaves a partial file
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print("Note: Could not write data cache. Error:", e)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    elif df is None:
+        # Decimated reads stream through the file and never hold the full-resolution data,
+        # so they don't build the cache
+        df = _parse_csv(filepath, step=step)
     
     if step > 1:
-        df = df.iloc[::step].copy()
         print(f"Downsampled by factor {step}")
     
+    # Clean up data (recordings are almost always in time order, so only sort when needed)
+    df = df.dropna(subset=['Time'])
+    if not df['Time'].is_monotonic_increasing:
+        df = df.sort_values('Time')
+    
     print(f"Data loaded successfully!")
     print(f"Shape: {df.shape}")
     print(f"Time range: {df['Time'].min():.3f}s to {df['Time'].max():.3f}s")
     
+    # The only reindex of the frame; decimated views are never copied beforehand
     return df.reset_index(drop=True)
 
 
-def create_plot(df, title="EEG and ECG Data Visualization", ecg_units='mv', channels=None, initial_range=None):
+# Single-pass M4 kernel over an (n, columns) block with `k` samples per bucket, writing
+# straight into preallocated channel-major out_t and out_y of shape (columns, 4 per bucket),
+# so each channel's output is one contiguous row
+if njit is not None:
+    @njit(cache=True)
+    def _m4_kernel(t, y, k, out_t, out_y):
+        n, n_cols = y.shape
+        for b in range(out_t.shape[1] // 4):
+            start = b * k
+            end = min(start + k, n) - 1
+            # Every channel of a bucket is scanned while its rows are still in cache
+            for c in range(n_cols):
+                # Extrema ignore NaN samples; an all-NaN bucket yields NaN at its first sample
+                j = start
+                while j < end and np.isnan(y[j, c]):
+                    j += 1
+                if np.isnan(y[j, c]):
+                    j = start
+                lo = hi = y[j, c]
+                lo_i = hi_i = j
+                for i in range(j + 1, end + 1):
+                    v = y[i, c]
+                    if v < lo:
+                        lo = v
+                        lo_i = i
+                    elif v > hi:
+                        hi = v
+                        hi_i = i
+                first_i, second_i = (hi_i, lo_i) if hi_i < lo_i else (lo_i, hi_i)
+                out_t[c, 4 * b] = t[start]
+                out_t[c, 4 * b + 1] = t[first_i]
+                out_t[c, 4 * b + 2] = t[second_i]
+                out_t[c, 4 * b + 3] = t[end]
+                out_y[c, 4 * b] = y[start, c]
+                out_y[c, 4 * b + 1] = y[first_i, c]
+                out_y[c, 4 * b + 2] = y[second_i, c]
+                out_y[c, 4 * b + 3] = y[end, c]
+else:
+    _m4_kernel = None
+
+
+# M4 decimation: reduce each column of y to its first, min, max and last sample per
+# pixel column, so the plot keeps the visible waveform envelope at a fraction of the points.
+# Extrema keep the time they occurred at, so decimated columns each get their own time
+# array: the returned time has the shape of the returned y. Undecimated input is returned
+# as-is with the shared 1-D time. Buckets smaller than M4_MIN_BUCKET samples aren't worth
+# the per-channel x arrays, so they are left undecimated.
+def decimate_m4(time, y, n_pixels=0):
+    n = len(time)
+    k = -(-n // n_pixels) if n_pixels > 0 else 0  # samples per bucket
+    if k < M4_MIN_BUCKET:
+        return time, y
+
+    y2 = y.reshape(n, -1)
+    n_buckets = -(-n // k)
+    if _m4_kernel is not None:
+        # One output buffer per axis for every channel; returned transposed so callers still index [:, i]
+        out_t = np.empty((y2.shape[1], 4 * n_buckets), dtype=time.dtype)
+        out_y = np.empty((y2.shape[1], 4 * n_buckets), dtype=y.dtype)
+        _m4_kernel(time, y2, k, out_t, out_y)
+        return (out_t.T, out_y.T) if y.ndim > 1 else (out_t[0], out_y[0])
+
+    pad = n_buckets * k - n
+    if pad:
+        # Repeating the last sample leaves first/min/max/last of the final bucket unchanged
+        y2 = np.concatenate([y2, np.repeat(y2[-1:], pad, axis=0)])
+    buckets = y2.reshape(n_buckets, k, -1)
+
+    # Extrema ignore NaN samples like the kernel does; an all-NaN bucket lands on index 0 and stays NaN
+    nan = np.isnan(buckets)
+    lo_idx = np.where(nan, np.inf, buckets).argmin(axis=1)
+    hi_idx = np.where(nan, -np.inf, buckets).argmax(axis=1)
+    # Keep the extrema in the order they occur so the line is drawn in the right direction
+    starts = np.arange(n_buckets) * k
+    ends = np.minimum(starts + k, n) - 1
+    idx = np.stack([np.broadcast_to(starts[:, None], lo_idx.shape),
+                    starts[:, None] + np.minimum(lo_idx, hi_idx),
+                    starts[:, None] + np.maximum(lo_idx, hi_idx),
+                    np.broadcast_to(ends[:, None], lo_idx.shape)], axis=1).reshape(4 * n_buckets, -1)
+
+    # Channel-major like the kernel's output, so each column slice is contiguous
+    idx = np.ascontiguousarray(idx.T)
+    t_out = time[idx].T
+    y_out = np.take_along_axis(y2[:n].T, idx, axis=1).T
+    return (t_out, y_out) if y.ndim > 1 else (t_out[:, 0], y_out[:, 0])
+
+
+# Build one WebGL line trace on the given axes
+def build_trace(channel, time_list, y, unit, xaxis, yaxis, **style):
+    return go.Scattergl(
+        x=time_list,
+        y=y.tolist(),
+        mode='lines',
+        name=channel,
+        hovertemplate=HOVER_TEMPLATE.format(channel=channel, unit=unit),
+        xaxis=xaxis,
+        yaxis=yaxis,
+        **style
+    )
+
+
+def create_plot(df, title="EEG and ECG Data Visualization", ecg_units='mv', channels=None, initial_range=None, n_pixels=0):
 
     # Define EEG channels (µV scale) - 21 channels total
     eeg_channels = ['P3', 'C3', 'F3', 'Fz', 'F4', 'C4', 'P4', 'Cz', 'A1', 'Fp1', 'Fp2', 
@@ -50,53 +283,62 @@ def create_plot(df, title="EEG and ECG Data Visualization", ecg_units='mv', chan
     cm_channels = ['CM']
     
     # Filter available channels
-    available_eeg = [ch for ch in eeg_channels if ch in df.columns]
-    available_ecg = [ch for ch in ecg_channels if ch in df.columns]
-    available_cm = [ch for ch in cm_channels if ch in df.columns]
+    col_set = set(df.columns)
+    available_eeg = [ch for ch in eeg_channels if ch in col_set]
+    available_ecg = [ch for ch in ecg_channels if ch in col_set]
+    available_cm = [ch for ch in cm_channels if ch in col_set]
     
     # Apply channel filtering if specified
     if channels:
-        available_eeg = [ch for ch in available_eeg if ch in channels]
-        available_ecg = [ch for ch in available_ecg if ch in channels]
-        available_cm = [ch for ch in available_cm if ch in channels]
+        wanted = set(channels)
+        available_eeg = [ch for ch in available_eeg if ch in wanted]
+        available_ecg = [ch for ch in available_ecg if ch in wanted]
+        available_cm = [ch for ch in available_cm if ch in wanted]
     
     print(f"Available EEG channels: {available_eeg}")
     print(f"Available ECG channels: {available_ecg}")
     print(f"Available CM channels: {available_cm}")
     
-    # Convert ECG to mV if needed
+    # Decimate every plotted channel in one block (opt-in; see decimate_m4)
+    time_arr, data = decimate_m4(df['Time'].to_numpy(), df[available_eeg + available_ecg + available_cm].to_numpy(np.float64), n_pixels)
+    eeg_data = data[:, :len(available_eeg)]
+    
+    # Convert ECG and CM to mV if needed (CM is typically much larger, so scale appropriately).
+    # One block multiply over both groups, without adding _mV columns to the caller's df.
+    mv_block = data[:, len(available_eeg):]
     if ecg_units == 'mv':
-        for ch in available_ecg:
-            df[f'{ch}_mV'] = df[ch] / 1000.0
-        ecg_data_cols = [f'{ch}_mV' for ch in available_ecg]
-        ecg_unit_label = 'mV'
+        mv_block = mv_block / 1000.0
+        ecg_unit_label = cm_unit_label = 'mV'
     else:
-        ecg_data_cols = available_ecg
-        ecg_unit_label = 'uV'
+        ecg_unit_label = cm_unit_label = 'uV'
+    ecg_data = mv_block[:, :len(available_ecg)]
+    cm_data = mv_block[:, len(available_ecg):]
+    
+    # Two stacked rows with a shared X-axis and a secondary Y-axis for CM on the bottom row.
+    # Axes are laid out directly (as make_subplots would) to skip its grid construction.
+    subplot_title = dict(xref='paper', yref='paper', x=0.47, xanchor='center', yanchor='bottom',
+                         showarrow=False, font=dict(size=12), yshift=8)
+    fig = go.Figure(layout=go.Layout(
+        xaxis=dict(anchor='y', domain=[0.0, 0.94], showticklabels=False),  # Only bottom row gets ticks
+        xaxis2=dict(anchor='y2', domain=[0.0, 0.94], matches='x', title_text="Time (seconds)"),
+        yaxis=dict(anchor='x', domain=[0.53, 1.0], title_text="Amplitude (uV)"),
+        yaxis2=dict(anchor='x2', domain=[0.0, 0.47], title_text=f"ECG ({ecg_unit_label})"),
+        yaxis3=dict(anchor='x2', overlaying='y2', side='right', title_text=f"CM ({cm_unit_label})", showgrid=False),
+        annotations=[
+            dict(subplot_title, text='EEG Channels (uV)', y=1.0),
+            dict(subplot_title, text=f'ECG and CM ({ecg_unit_label})', y=0.47),
+        ]
+    ))
     
-    # Convert CM to mV if needed (CM is typically much larger, so scale appropriately)
-    if ecg_units == 'mv' and available_cm:
-        df[f'CM_mV'] = df['CM'] / 1000.0
-        cm_data_cols = [f'CM_mV']
-        cm_unit_label = 'mV'
+    # Values are handed over as plain lists because Scattergl's up-front data clean pass is slow
+    # on typed (Float32Array) inputs.
+    # Undecimated channels share one time list; decimated ones each carry their extrema's times.
+    if time_arr.ndim == 1:
+        x_lists = [time_arr.tolist()] * data.shape[1]
     else:
-        cm_data_cols = available_cm
-        cm_unit_label = 'uV'
-    
-    # Create subplots with shared X-axis
-    fig = make_subplots(
-        rows=2, cols=1,
-        subplot_titles=(f'EEG Channels (uV)', f'ECG and CM ({ecg_unit_label})'),
-        vertical_spacing=0.06,
-        shared_xaxes=True,  # Link X-axes
-        specs=[[{"secondary_y": False}], [{"secondary_y": True}]]  # Allow secondary Y for CM
-    )
-    
-    # Choose scatter class based on data size for performance
-    def _scatter_cls(n):
-        return go.Scattergl if n > 10000 else go.Scatter
-    
-    scatter_cls = _scatter_cls(len(df))
+        x_lists = [time_arr[:, j].tolist() for j in range(data.shape[1])]
+    ecg_x = x_lists[len(available_eeg):]
+    cm_x = ecg_x[len(available_ecg):]
     
     # Colors for different channels
     colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', 
@@ -104,65 +346,40 @@ def create_plot(df, title="EEG and ECG Data Visualization", ecg_units='mv', chan
               '#98df8a', '#ff9896', '#c5b0d5', '#c49c94', '#f7b6d3', '#c7c7c7',
               '#dbdb8d', '#9edae5', '#ad494a']
     
+    traces = []
+    
     # Plot EEG channels (µV scale)
     for i, channel in enumerate(available_eeg):
         color = colors[i % len(colors)]
-        fig.add_trace(
-            scatter_cls(
-                x=df['Time'],
-                y=df[channel],
-                mode='lines',
-                name=channel,
-                line=dict(color=color, width=0.8),
-                hovertemplate=f'<b>{channel}</b><br>' +
-                             'Time: %{x:.3f}s<br>' +
-                             'Value: %{y:.1f}uV<br>' +
-                             '<extra></extra>',
-                legendgroup='eeg'
-            ),
-            row=1, col=1
-        )
+        traces.append(build_trace(
+            channel, x_lists[i], eeg_data[:, i], 'uV', 'x', 'y',
+            line={'color': color, 'width': 0.8},
+            legendgroup='eeg'
+        ))
     
     # Plot ECG channels (make them more prominent)
-    for i, (channel, data_col) in enumerate(zip(available_ecg, ecg_data_cols)):
+    for i, channel in enumerate(available_ecg):
         color = colors[i % len(colors)]
-        fig.add_trace(
-            scatter_cls(
-                x=df['Time'],
-                y=df[data_col],
-                mode='lines',
-                name=channel,
-                line=dict(color=color, width=1.5),
-                opacity=0.9,
-                hovertemplate=f'<b>{channel}</b><br>' +
-                             'Time: %{x:.3f}s<br>' +
-                             f'Value: %{{y:.1f}}{ecg_unit_label}<br>' +
-                             '<extra></extra>',
-                legendgroup='ecg',
-                showlegend=True
-            ),
-            row=2, col=1
-        )
+        traces.append(build_trace(
+            channel, ecg_x[i], ecg_data[:, i], ecg_unit_label, 'x2', 'y2',
+            line={'color': color, 'width': 1.5},
+            opacity=0.9,
+            legendgroup='ecg',
+            showlegend=True
+        ))
     
     # Plot CM reference channel on secondary Y-axis (muted appearance)
-    for i, (channel, data_col) in enumerate(zip(available_cm, cm_data_cols)):
-        fig.add_trace(
-            scatter_cls(
-                x=df['Time'],
-                y=df[data_col],
-                mode='lines',
-                name=channel,
-                line=dict(color='lightgray', width=0.8, dash='dot'),
-                opacity=0.6,
-                hovertemplate=f'<b>{channel}</b><br>' +
-                             'Time: %{x:.3f}s<br>' +
-                             f'Value: %{{y:.1f}}{cm_unit_label}<br>' +
-                             '<extra></extra>',
-                legendgroup='cm',
-                showlegend=True
-            ),
-            row=2, col=1, secondary_y=True
-        )
+    for i, channel in enumerate(available_cm):
+        traces.append(build_trace(
+            channel, cm_x[i], cm_data[:, i], cm_unit_label, 'x2', 'y3',
+            line={'color': 'lightgray', 'width': 0.8, 'dash': 'dot'},
+            opacity=0.6,
+            legendgroup='cm',
+            showlegend=True
+        ))
+    
+    # One add_traces call validates and attaches every trace at once
+    fig.add_traces(traces)
     
     # Update layout with improved UX
     fig.update_layout(
@@ -206,27 +423,12 @@ def create_plot(df, title="EEG and ECG Data Visualization", ecg_units='mv', chan
         )
     )
     
-    # Shared x-axis behavior
-    fig.update_xaxes(matches='x')
-    
-    # Only bottom row gets x-axis title/ticks
-    fig.update_xaxes(title_text=None, showticklabels=False, row=1, col=1)
-    fig.update_xaxes(title_text="Time (seconds)", row=2, col=1)
-    
-    # Update y-axes with better range management
-    fig.update_yaxes(title_text="Amplitude (uV)", row=1, col=1)
-    fig.update_yaxes(title_text=f"ECG ({ecg_unit_label})", row=2, col=1, secondary_y=False)
-    fig.update_yaxes(title_text=f"CM ({cm_unit_label})", row=2, col=1, secondary_y=True, showgrid=False)
-    
-    # Improve subplot title visibility
-    fig.update_annotations(font_size=12, yshift=8)
-    
-    # Set reasonable ranges for better visibility
-    if available_ecg and ecg_data_cols:
-        ecg_data = df[ecg_data_cols].values
-        ecg_min, ecg_max = ecg_data.min(), ecg_data.max()
+    # Set reasonable ranges for better visibility. ecg_data is the decimated ndarray block,
+    # which still holds every bucket's extrema, so the reductions touch only the plotted points.
+    if available_ecg:
+        ecg_min, ecg_max = np.nanmin(ecg_data), np.nanmax(ecg_data)
         ecg_padding = (ecg_max - ecg_min) * 0.1
-        fig.update_yaxes(range=[ecg_min - ecg_padding, ecg_max + ecg_padding], row=2, col=1, secondary_y=False)
+        fig.update_layout(yaxis2_range=[ecg_min - ecg_padding, ecg_max + ecg_padding])
     
     # Set initial range if specified
     if initial_range:
@@ -253,6 +455,47 @@ def add_zoom_controls(fig):
         ]
     )
 
+# Minimal standalone page around an already-serialized figure, loading plotly.js from the CDN
+HTML_TEMPLATE = """<!doctype html>
+<html>
+<head>
+    <meta charset="utf-8" />
+    <script charset="utf-8" src="https://cdn.plot.ly/plotly-{plotlyjs_version}.min.js"></script>
+</head>
+<body>
+    <div id="multichannel-plot"></div>
+    <script>
+        var T = {time_json};
+        var T_TRACES = {shared_json};
+        var fig = {fig_json};
+        T_TRACES.forEach(function (i) {{
+            fig.data[i].x = T;
+        }});
+        Plotly.newPlot("multichannel-plot", fig.data, fig.layout, {{responsive: true}});
+    </script>
+</body>
+</html>
+"""
+
+
+# Serialize the figure, writing the x array that the traces share only once.
+# Returns (time_json, shared_json, fig_json); shared_json lists the traces stripped of x,
+# which get it back from the time array in the page.
+def _serialize_figure(fig):
+    fig_dict = fig.to_plotly_json()
+    data = fig_dict['data']
+    shared_x = data[0].get('x') if data else None
+    shared = []
+    if shared_x is not None:
+        for i, trace in enumerate(data):
+            x = trace.get('x')
+            if x is not None and np.array_equal(x, shared_x):
+                del trace['x']
+                shared.append(i)
+    return (to_json_plotly(shared_x, engine=JSON_ENGINE), to_json_plotly(shared, engine=JSON_ENGINE),
+            to_json_plotly(fig_dict, engine=JSON_ENGINE))
+
+
 def save_plot(fig, output_dir="output"):
 
     # Create output directory if it doesn't exist
@@ -260,7 +503,11 @@ def save_plot(fig, output_dir="output"):
     
     # Save as HTML (interactive)
     html_path = os.path.join(output_dir, "multichannel_plot.html")
-    fig.write_html(html_path, include_plotlyjs='cdn')
+    time_json, shared_json, fig_json = _serialize_figure(fig)
+    html = HTML_TEMPLATE.format(plotlyjs_version=get_plotlyjs_version(), time_json=time_json,
+                                shared_json=shared_json, fig_json=fig_json)
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html)
     print(f"Interactive plot saved to: {html_path}")
     
     # Save static images with error handling
@@ -300,6 +547,11 @@ def main():
                        help='Plot ECG as µV or mV (default: mV)')
     parser.add_argument('--step', type=int, default=1,
                        help='Downsample step (e.g., 5 keeps every 5th sample)')
+    parser.add_argument('--pixels', type=int, default=0,
+                       help='Decimate each trace to min/max per pixel column at this width (default: 0, off); '
+                            'zoomed-in views then show the decimated envelope rather than every sample')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always re-parse the CSV instead of using its Parquet cache')
     parser.add_argument('--initial-range', nargs=2, type=float, metavar=('START', 'END'),
                        help='Initial time range to display (e.g., --initial-range 0 10)')
     
@@ -307,11 +559,11 @@ def main():
     
     try:
         # Load data
-        df = load_data(args.data, step=args.step)
+        df = load_data(args.data, step=args.step, cache=not args.no_cache)
         
         # Create plot
         print("Creating interactive plot...")
-        fig = create_plot(df, args.title, ecg_units=args.ecg_units, channels=args.channels, initial_range=args.initial_range)
+        fig = create_plot(df, args.title, ecg_units=args.ecg_units, channels=args.channels, initial_range=args.initial_range, n_pixels=args.pixels)
         
         # Add zoom controls
         add_zoom_controls(fig)
@@ -0,0 +1,148 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+import main
+
+
+# Write a small recording in the acquisition format: '#' metadata lines, a header, then samples
+def write_csv(path, rows, columns=('Time', 'Fz', 'X1:LEOG', 'Trigger')):
+    lines = ['# Sample_Frequency_(Hz) =,300', '# Sensor_Data_Units =,uV', ','.join(columns)]
+    lines += [','.join(str(v) for v in row) for row in rows]
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+def sample_rows(n):
+    return [(f'{i / 300:.4f}', f'{(i % 50) - 25:.1f}', f'{-2000 - i % 7:.1f}', 0) for i in range(n)]
+
+
+def test_step_picks_same_samples_with_and_without_cache(tmp_path):
+    rows = sample_rows(100)
+    rows[1] = ('',) + rows[1][1:]  # a row without a timestamp
+    path = write_csv(tmp_path / 'rec.csv', rows)
+
+    streamed = main.load_data(path, step=3)
+    main.load_data(path)  # builds the Parquet cache
+    cached = main.load_data(path, step=3)
+
+    np.testing.assert_array_equal(streamed['Time'], cached['Time'])
+    assert streamed['Time'][:3].tolist() == [0.0, 0.01, 0.02]
+
+
+@pytest.mark.parametrize('step', [1, 3])
+def test_bad_value_past_first_block_is_coerced(tmp_path, monkeypatch, step):
+    monkeypatch.setattr(main, 'CHUNK_BYTES', 1024)
+    rows = sample_rows(600)
+    rows[450] = rows[450][:1] + ('oops',) + rows[450][2:]
+    path = write_csv(tmp_path / 'rec.csv', rows)
+
+    df = main.load_data(path, step=step, cache=False)
+
+    assert len(df) == 600 // step
+    assert df['Fz'].isna().sum() == 1
+    assert df['Fz'].dtype == np.float64
+
+
+def test_column_empty_in_first_block_is_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'CHUNK_BYTES', 1024)
+    rows = [row[:2] + ('' if i < 300 else row[2],) + row[3:] for i, row in enumerate(sample_rows(600))]
+    path = write_csv(tmp_path / 'rec.csv', rows)
+
+    df = main.load_data(path, step=3, cache=False)
+
+    assert df['X1:LEOG'].notna().sum() == 100
+
+
+def test_m4_kernel_and_numpy_fallback_agree_on_nan(monkeypatch):
+    if main._m4_kernel is None:
+        pytest.skip('numba is not installed')
+    rng = np.random.default_rng(0)
+    time = np.arange(6400) / 300
+    y = rng.normal(size=(6400, 3))
+    y[0, 0] = np.nan           # first sample of a bucket
+    y[128:192, 1] = np.nan     # a whole bucket
+    y[rng.integers(0, 6400, 50), 2] = np.nan
+
+    t_jit, y_jit = main.decimate_m4(time, y, n_pixels=100)
+    monkeypatch.setattr(main, '_m4_kernel', None)
+    t_np, y_np = main.decimate_m4(time, y, n_pixels=100)
+
+    np.testing.assert_array_equal(t_jit, t_np)
+    np.testing.assert_array_equal(y_jit, y_np)
+    assert not np.isnan(y_jit[1:3, 0]).any()
+    assert np.isnan(y_jit[8:12, 1]).all()
+
+
+@pytest.mark.parametrize('step', [1, 3])
+@pytest.mark.parametrize('edit', ['bom', 'blank_line', 'late_comment'])
+def test_reads_like_pandas_comment_parser(tmp_path, step, edit):
+    path = write_csv(tmp_path / 'rec.csv', sample_rows(30))
+    lines = open(path).read().split('\n')
+    if edit == 'bom':
+        lines[0] = '\ufeff' + lines[0]
+    elif edit == 'blank_line':
+        lines.insert(2, '')
+    else:
+        lines.insert(10, '# marker')
+    open(path, 'w', encoding='utf-8').write('\n'.join(lines))
+
+    df = main.load_data(path, step=step, cache=False)
+
+    assert list(df.columns) == ['Time', 'Fz', 'X1:LEOG']
+    assert len(df) == 30 // step
+
+
+@pytest.mark.parametrize('use_kernel', [True, False])
+def test_m4_matches_brute_force_buckets(monkeypatch, use_kernel):
+    if use_kernel and main._m4_kernel is None:
+        pytest.skip('numba is not installed')
+    if not use_kernel:
+        monkeypatch.setattr(main, '_m4_kernel', None)
+    rng = np.random.default_rng(1)
+    time = np.arange(6500) / 300
+    y = rng.normal(size=(6500, 2))
+    y[3333, 0] = 50.0  # a lone spike
+    y[rng.integers(0, 6500, 40), 1] = np.nan
+
+    t_out, y_out = main.decimate_m4(time, y, n_pixels=100)
+
+    k = 65
+    for c in range(2):
+        expected_t, expected_y = [], []
+        for start in range(0, 6500, k):
+            seg = y[start:start + k, c]
+            picks = sorted({int(np.nanargmin(seg)), int(np.nanargmax(seg))})
+            idx = [0, picks[0], picks[-1], len(seg) - 1]
+            expected_t += [time[start + i] for i in idx]
+            expected_y += [seg[i] for i in idx]
+        np.testing.assert_array_equal(t_out[:, c], expected_t)
+        np.testing.assert_array_equal(y_out[:, c], expected_y)
+    assert t_out[y_out[:, 0] == 50.0, 0].tolist() == [time[3333]]
+
+
+def test_unreadable_cache_is_rebuilt(tmp_path):
+    path = write_csv(tmp_path / 'rec.csv', sample_rows(30))
+    cache_path = f'{path}.v{main.CACHE_VERSION}.parquet'
+    with open(cache_path, 'wb') as f:
+        f.write(b'PAR1 truncated')  # as left by an interrupted write
+
+    df = main.load_data(path)
+
+    assert len(df) == 30
+    assert pd.read_parquet(cache_path).shape == (30, 3)
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == '.tmp'] == []
+
+
+def test_serialize_figure_lists_only_stripped_traces():
+    fig = go.Figure([go.Scattergl(x=[0.0, 1.0], y=[1, 2]), go.Scattergl(y=[3, 4], x0=5, dx=2),
+                          go.Scattergl(x=[0.0, 1.0], y=[5, 6])])
+
+    time_json, shared_json, fig_json = main._serialize_figure(fig)
+
+    assert json.loads(time_json) == [0.0, 1.0]
+    assert json.loads(shared_json) == [0, 2]
+    assert ['x' in trace for trace in json.loads(fig_json)['data']] == [False, False, False]